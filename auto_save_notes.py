@@ -16,10 +16,249 @@ Usage:
     )
 """
 
-from typing import Optional, Tuple
+import asyncio
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple, TypeVar
+import httpx
 from notebooklm_mcp.api_client import NotebookLMClient
-from client_factory import get_notebooklm_client
-from config import get_config
+from client_factory import ClientFactory, get_notebooklm_client, open_connection_pool
+from config import Config, get_config
+from query_cache import TTLCache, make_query_key
+
+log = logging.getLogger(__name__)
+
+# Exact-match cache of query responses: (notebook_id, question hash) -> response
+_QCACHE = TTLCache(maxsize=512, ttl=300)
+
+
+T = TypeVar("T")
+
+# Retry policy for transient network failures
+_MAX_ATTEMPTS = 5
+_BACKOFF_BASE = 0.5  # seconds, doubled on every attempt
+_BACKOFF_MAX = 30.0
+_RETRY_STATUS = frozenset({429, 502, 503, 504})
+_RETRY_ERRORS: Tuple[type, ...] = (httpx.TransportError,)
+
+# Non-idempotent requests (adding a source) are retried only when the
+# server surely did not act on them: connection never established,
+# rate limited or unavailable. A read error or 502/504 may come after
+# the source was already created, and a retry would duplicate the note.
+_SAFE_RETRY_STATUS = frozenset({429, 503})
+_SAFE_RETRY_ERRORS: Tuple[type, ...] = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+def _retry_delay(
+    error: Exception,
+    attempt: int,
+    retry_status: frozenset = _RETRY_STATUS,
+    retry_errors: Tuple[type, ...] = _RETRY_ERRORS
+) -> Optional[float]:
+    """
+    Returns seconds to wait before next attempt, or None if error is not transient.
+    
+    Honors Retry-After header of rate-limit responses, otherwise uses
+    exponential backoff with full jitter.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        if error.response.status_code not in retry_status:
+            return None
+        retry_after = error.response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), _BACKOFF_MAX)
+    elif not isinstance(error, retry_errors):
+        return None
+    return random.uniform(0, min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** attempt))
+
+
+def _with_retry(
+    func: Callable[..., T],
+    *args,
+    retry_status: frozenset = _RETRY_STATUS,
+    retry_errors: Tuple[type, ...] = _RETRY_ERRORS,
+    **kwargs
+) -> T:
+    """
+    Calls func, retrying transient network errors (timeouts, connection
+    errors, 429/5xx by default) up to _MAX_ATTEMPTS times. Other errors
+    are raised at once.
+    """
+    for attempt in range(_MAX_ATTEMPTS - 1):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            delay = _retry_delay(e, attempt, retry_status, retry_errors)
+            if delay is None:
+                raise
+            log.warning("⚠️  Transient error (%s), retrying in %.1fs", e, delay)
+            time.sleep(delay)
+    
+    # Last attempt: any error propagates
+    return func(*args, **kwargs)
+
+
+def _do_query(client: NotebookLMClient, notebook_id: str, question: str):
+    """Queries notebook with retries on transient errors."""
+    return _with_retry(client.query, notebook_id, question)
+
+
+def _do_add_source(client: NotebookLMClient, notebook_id: str, text: str, title: str):
+    """Adds text source, retrying only errors that can't have created it."""
+    return _with_retry(
+        client.add_text_source,
+        notebook_id=notebook_id, text=text, title=title,
+        retry_status=_SAFE_RETRY_STATUS, retry_errors=_SAFE_RETRY_ERRORS
+    )
+
+
+def _build_note_payload(question: str, answer: str) -> str:
+    """
+    Builds note text: question for context, then the answer.
+    
+    The client JSON-encodes text into the request body, so the payload
+    has to be a str; str.join allocates it once with the exact final size.
+    The payload is not bound to a local in the caller, so for multi-MB
+    answers it is released as soon as the request is sent.
+    """
+    return "".join(("Question: ", question, "\n\n", answer))
+
+
+# English function words dropped by compress_answer(): articles, forms
+# of "be" and plain prepositions. Words that change meaning (modals,
+# quantifiers, comparatives, negations, pronouns) are not in the list.
+_STOPWORDS = frozenset("""
+a an the
+is are was were be been being am
+of in on at by for with into about
+""".split())
+_STRIP_CHARS = ".,;:!?\"'()[]"
+
+
+def compress_answer(answer: str) -> str:
+    """
+    Shortens answer text for storage by dropping English function words
+    (articles, forms of "be", plain prepositions).
+    
+    Saved notes are fed back into later prompts as sources, so a denser
+    note costs fewer tokens every time it is retrieved. Line breaks are
+    kept (lists, headings stay readable) and fenced code blocks are
+    copied unchanged. Punctuation attached to a dropped word is kept
+    ("(the thing) is big." becomes "(thing) big."); a stopword wrapped
+    in quotes or brackets on both sides is kept whole.
+    
+    Args:
+        answer: Answer text
+    
+    Returns:
+        Compressed answer text
+    """
+    lines = []
+    in_code = False
+    for line in answer.split("\n"):
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+            lines.append(line)
+            continue
+        if in_code:
+            lines.append(line)
+            continue
+        
+        words: List[str] = []
+        lead = ""  # Leading punctuation of dropped words, goes to next word
+        for word in line.split():
+            core = word.strip(_STRIP_CHARS)
+            start = len(word) - len(word.lstrip(_STRIP_CHARS))
+            tail = word[start + len(core):]
+            # Single letters match case-sensitively: "A" may be a name, "a" isn't
+            key = core if len(core) == 1 else core.lower()
+            if key not in _STOPWORDS or (start and tail):
+                words.append(lead + word)
+                lead = ""
+                continue
+            
+            lead += word[:start]
+            if words:
+                words[-1] += tail
+            else:
+                lead += tail
+        if lead:
+            if words:
+                words[-1] += lead
+            else:
+                words.append(lead)
+        lines.append(" ".join(words))
+    return "\n".join(lines)
+
+
+def extract_answer(response) -> Optional[str]:
+    """
+    Extracts answer text from NotebookLM query response.
+    
+    The client usually returns a plain dict with 'answer' (or 'response')
+    field; exact dict type is checked first as the cheap common case.
+    
+    Args:
+        response: Response returned by client.query
+    
+    Returns:
+        Answer text (response itself if it's not a dict)
+    """
+    if response.__class__ is dict or isinstance(response, dict):
+        return response.get('answer') or response.get('response') or str(response)
+    return response
+
+
+def answer_text(response) -> Optional[str]:
+    """
+    Returns answer field of NotebookLM query response, or None if empty.
+    
+    Unlike extract_answer() there is no str(response) fallback, so an
+    unparsed response never passes for an answer. Caches store a response
+    only when this returns text.
+    
+    Args:
+        response: Response returned by client.query
+    
+    Returns:
+        Answer text or None
+    """
+    if response.__class__ is dict or isinstance(response, dict):
+        return response.get('answer') or response.get('response') or None
+    return response or None
+
+
+def query_response(
+    client: NotebookLMClient,
+    notebook_id: str,
+    question: str,
+    config: Optional[Config] = None
+):
+    """
+    Queries notebook, serving repeated questions from the in-memory cache.
+    
+    Transient network errors are retried, other errors propagate.
+    Responses without answer text are returned but not cached.
+    
+    Args:
+        client: NotebookLM client
+        notebook_id: Notebook ID
+        question: Question for query
+        config: Configuration to use (default: global configuration)
+    
+    Returns:
+        Raw response returned by client.query
+    """
+    config = config or get_config()
+    cache_key = make_query_key(notebook_id, question) if config.use_query_cache else None
+    response = _QCACHE.get(cache_key) if cache_key is not None else None
+    if response is None:
+        response = _do_query(client, notebook_id, question)
+        if cache_key is not None and answer_text(response):
+            _QCACHE.set(cache_key, response)
+    return response
 
 
 def save_answer_as_note(
@@ -27,7 +266,8 @@ def save_answer_as_note(
     question: str,
     answer: str,
     client: Optional[NotebookLMClient] = None,
-    note_prefix: Optional[str] = None
+    note_prefix: Optional[str] = None,
+    config: Optional[Config] = None
 ) -> Optional[str]:
     """
     Saves NotebookLM response as a note (text source) in notebook.
@@ -38,6 +278,10 @@ def save_answer_as_note(
         answer: Response from NotebookLM
         client: Optional NotebookLM client. If not specified, will be created automatically
         note_prefix: Prefix for note title (default from configuration)
+        config: Configuration to use (default: global configuration)
+    
+    With config.compress_notes the answer is stored through
+    compress_answer(); the caller still gets the full answer.
     
     Returns:
         ID of created source or None on error
@@ -51,64 +295,113 @@ def save_answer_as_note(
         >>> print(f"Note saved with ID: {source_id}")
     """
     # Get configuration
-    config = get_config()
+    config = config or get_config()
     
     # Create client if not provided
     if client is None:
         client = get_notebooklm_client()
         if not client:
-            print("❌ Error: Tokens not found. Run notebooklm-mcp-auth")
+            log.error("❌ Error: Tokens not found. Run notebooklm-mcp-auth")
             return None
     
-    # Use prefix from parameter or configuration
-    prefix = note_prefix or config.note_prefix
+    # Generate note title via configuration (custom prefix takes priority)
+    note_title = config.get_note_title(question, prefix_override=note_prefix)
     
-    # Generate note title via configuration
-    note_title = config.get_note_title(question)
-    # If custom prefix provided, replace it
-    if note_prefix:
-        note_title = f"{note_prefix} {note_title.split(' ', 1)[1] if ' ' in note_title else note_title}"
-    
-    # Format full note text
-    # Include question for context
-    full_note_text = f"""Question: {question}
-
-{answer}"""
+    if config.compress_notes:
+        answer = compress_answer(answer)
     
     try:
-        # Add text source
-        result = client.add_text_source(
-            notebook_id=notebook_id,
-            text=full_note_text,
-            title=note_title
-        )
+        # Add text source (question included for context)
+        result = _do_add_source(client, notebook_id, _build_note_payload(question, answer), note_title)
         
         if result:
-            source_id = result.get('sourceId') or result.get('id') or result.get('source', {}).get('id')
+            src = result.get('source')
+            source_id = result.get('sourceId') or result.get('id') or (src.get('id') if isinstance(src, dict) else None)
             if source_id:
-                print(f"✅ Note saved: {note_title}")
-                print(f"   Source ID: {source_id}")
+                log.info("✅ Note saved: %s", note_title)
+                log.info("   Source ID: %s", source_id)
                 return source_id
             else:
-                print(f"⚠️  Note added but ID not received: {note_title}")
+                log.warning("⚠️  Note added but ID not received: %s", note_title)
                 return None
         else:
-            print(f"❌ Error: Failed to save note: {note_title}")
+            log.error("❌ Error: Failed to save note: %s", note_title)
             return None
             
     except Exception as e:
-        print(f"❌ Error saving note: {e}")
-        import traceback
-        traceback.print_exc()
+        # Full traceback only in verbose mode, one line otherwise
+        log.error("❌ Error saving note: %s", e, exc_info=config.verbose)
         return None
 
 
+def save_answers_as_notes(
+    notebook_id: str,
+    items: List[Tuple[str, str]],
+    client: Optional[NotebookLMClient] = None,
+    note_prefix: Optional[str] = None,
+    max_workers: int = 10,
+    config: Optional[Config] = None
+) -> List[Optional[str]]:
+    """
+    Saves several question/answer pairs as notes in one call.
+    
+    NotebookLM has no bulk endpoint for text sources, so the notes are
+    submitted concurrently on a shared client. Total time is close to
+    one round-trip instead of one round-trip per note.
+    
+    Args:
+        notebook_id: Notebook ID where to save the notes
+        items: List of (question, answer) pairs
+        client: Optional NotebookLM client. If not specified, will be created automatically
+        note_prefix: Prefix for note titles (default from configuration)
+        max_workers: Maximum number of notes saved in parallel
+        config: Configuration to use (default: global configuration)
+    
+    Returns:
+        List of source IDs in the same order as items (None for failed notes)
+    
+    Raises:
+        AuthError: If client not provided and tokens not found
+    
+    Example:
+        >>> source_ids = save_answers_as_notes(
+        ...     notebook_id="abc123",
+        ...     items=[("What is Python?", "Python is..."), ("What is Go?", "Go is...")]
+        ... )
+    """
+    if not items:
+        return []
+    
+    # Resolve configuration and client once so all workers share them
+    config = config or get_config()
+    if client is None:
+        ClientFactory().ensure_authenticated()
+        client = get_notebooklm_client()
+    if client is not None:
+        open_connection_pool(client)
+    
+    def save(item: Tuple[str, str]) -> Optional[str]:
+        question, answer = item
+        return save_answer_as_note(
+            notebook_id=notebook_id,
+            question=question,
+            answer=answer,
+            client=client,
+            note_prefix=note_prefix,
+            config=config
+        )
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(save, items))
+
+
 def query_and_save(
     notebook_id: str,
     question: str,
     client: Optional[NotebookLMClient] = None,
     auto_save: Optional[bool] = None,
-    note_prefix: Optional[str] = None
+    note_prefix: Optional[str] = None,
+    config: Optional[Config] = None
 ) -> Tuple[Optional[str], Optional[str]]:
     """
     Executes query to notebook and automatically saves response as note.
@@ -119,6 +412,7 @@ def query_and_save(
         client: Optional NotebookLM client
         auto_save: Automatically save response as note (default from configuration)
         note_prefix: Prefix for note title (default from configuration)
+        config: Configuration to use (default: global configuration)
     
     Returns:
         Tuple (answer, source_id) or (None, None) on error
@@ -133,30 +427,25 @@ def query_and_save(
         >>> print(f"Note ID: {source_id}")
     """
     # Get configuration
-    config = get_config()
+    config = config or get_config()
     
     # Create client if not provided
     if client is None:
         client = get_notebooklm_client()
         if not client:
-            print("❌ Error: Tokens not found. Run notebooklm-mcp-auth")
+            log.error("❌ Error: Tokens not found. Run notebooklm-mcp-auth")
             return None, None
     
     # Use value from parameter or configuration
     should_save = auto_save if auto_save is not None else config.default_auto_save
     
-    # Execute query
+    # Execute query (repeated questions are served from cache)
     try:
-        response = client.query(notebook_id, question)
-        
-        # Extract answer if it's an object with answer field
-        if isinstance(response, dict):
-            answer = response.get('answer') or response.get('response') or str(response)
-        else:
-            answer = response
+        response = query_response(client, notebook_id, question, config)
+        answer = extract_answer(response)
         
         if not answer:
-            print("❌ Failed to get response from NotebookLM")
+            log.error("❌ Failed to get response from NotebookLM")
             return None, None
         
         # Automatically save as note if enabled
@@ -167,14 +456,120 @@ def query_and_save(
                 question=question,
                 answer=answer,
                 client=client,
-                note_prefix=note_prefix
+                note_prefix=note_prefix,
+                config=config
             )
         
         return answer, source_id
         
     except Exception as e:
-        print(f"❌ Error during query: {e}")
-        import traceback
-        traceback.print_exc()
+        log.error("❌ Error during query: %s", e, exc_info=config.verbose)
         return None, None
 
+
+async def aquery_and_save(
+    notebook_id: str,
+    question: str,
+    client: Optional[NotebookLMClient] = None,
+    auto_save: Optional[bool] = None,
+    note_prefix: Optional[str] = None,
+    config: Optional[Config] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Async version of query_and_save.
+    
+    The client is synchronous, so the blocking query and note save
+    are run in a worker thread. This lets several questions overlap
+    on the network instead of waiting for each other.
+    
+    Args:
+        notebook_id: Notebook ID
+        question: Question for query
+        client: Optional NotebookLM client
+        auto_save: Automatically save response as note (default from configuration)
+        note_prefix: Prefix for note title (default from configuration)
+        config: Configuration to use (default: global configuration)
+    
+    Returns:
+        Tuple (answer, source_id) or (None, None) on error
+    """
+    return await asyncio.to_thread(
+        query_and_save,
+        notebook_id=notebook_id,
+        question=question,
+        client=client,
+        auto_save=auto_save,
+        note_prefix=note_prefix,
+        config=config
+    )
+
+
+async def abatch_query_and_save(
+    notebook_id: str,
+    questions: List[str],
+    client: Optional[NotebookLMClient] = None,
+    auto_save: Optional[bool] = None,
+    note_prefix: Optional[str] = None,
+    max_workers: int = 10,
+    config: Optional[Config] = None
+) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Executes several queries concurrently and saves responses as notes.
+    
+    Wall time becomes roughly the slowest query instead of the sum
+    of all of them. Concurrency is capped by max_workers so the
+    NotebookLM rate limits are not hit all at once.
+    
+    Args:
+        notebook_id: Notebook ID
+        questions: Questions for query
+        client: Optional NotebookLM client (shared by all queries)
+        auto_save: Automatically save responses as notes (default from configuration)
+        note_prefix: Prefix for note titles (default from configuration)
+        max_workers: Maximum number of queries in flight
+        config: Configuration to use (default: global configuration)
+    
+    Returns:
+        List of (answer, source_id) tuples in the same order as questions.
+        A failed query yields (None, None).
+    
+    Raises:
+        AuthError: If client not provided and tokens not found
+    
+    Example:
+        >>> results = asyncio.run(abatch_query_and_save(
+        ...     notebook_id="abc123",
+        ...     questions=["What is Python?", "What is a decorator?"]
+        ... ))
+    """
+    # Resolve configuration and client once so all workers share them
+    config = config or get_config()
+    if client is None:
+        ClientFactory().ensure_authenticated()
+        client = get_notebooklm_client()
+    if client is not None:
+        open_connection_pool(client)
+    
+    semaphore = asyncio.Semaphore(max_workers)
+    
+    async def worker(question: str) -> Tuple[Optional[str], Optional[str]]:
+        async with semaphore:
+            return await aquery_and_save(
+                notebook_id=notebook_id,
+                question=question,
+                client=client,
+                auto_save=auto_save,
+                note_prefix=note_prefix,
+                config=config
+            )
+    
+    results = await asyncio.gather(
+        *(worker(q) for q in questions),
+        return_exceptions=True
+    )
+    
+    # gather keeps input order; map unexpected exceptions to empty results
+    return [
+        (None, None) if isinstance(result, BaseException) else result
+        for result in results
+    ]
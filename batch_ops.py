@@ -0,0 +1,146 @@
+"""
+Mixed batch execution of NotebookLM operations.
+
+Problem it solves:
+- Typical workflows loop "create notebook -> add sources -> query" one call at a time
+- Full fan-out (one task per request) floods the server and hits rate limits
+- Pure sequential batching gives the worst response time
+
+Solution:
+- Operations are grouped by type and split into sub-batches (~8 ops)
+- Sub-batches are submitted asynchronously, at most max_inflight at a time
+- Phases run in dependency order: notebooks, then sources, then queries
+
+Usage:
+    import asyncio
+    from batch_ops import AddTextSource, Query, submit_mixed
+
+    results = asyncio.run(submit_mixed([
+        AddTextSource(notebook_id="abc123", text="...", title="Intro"),
+        Query(notebook_id="abc123", question="What is Python?"),
+    ]))
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from notebooklm_mcp.api_client import NotebookLMClient
+from client_factory import AuthError, ClientFactory, get_notebooklm_client, open_connection_pool
+
+
+@dataclass
+class CreateNotebook:
+    """Operation: create a notebook. Result: created notebook object."""
+    title: str
+
+
+@dataclass
+class AddTextSource:
+    """Operation: add pasted text as a source. Result: raw client response."""
+    notebook_id: str
+    text: str
+    title: str
+
+
+@dataclass
+class Query:
+    """Operation: ask a question. Result: raw client response."""
+    notebook_id: str
+    question: str
+
+
+Op = Union[CreateNotebook, AddTextSource, Query]
+
+# Execution order of operation types: sources must exist before they are queried
+_PHASES: Tuple[Type, ...] = (CreateNotebook, AddTextSource, Query)
+
+
+def _run_op(client: NotebookLMClient, op: Op) -> Any:
+    """Executes single operation on the client."""
+    if isinstance(op, CreateNotebook):
+        return client.create_notebook(op.title)
+    if isinstance(op, AddTextSource):
+        return client.add_text_source(
+            notebook_id=op.notebook_id,
+            text=op.text,
+            title=op.title
+        )
+    if isinstance(op, Query):
+        return client.query(op.notebook_id, op.question)
+    raise TypeError(f"Unknown operation: {op!r}")
+
+
+def _run_sub_batch(client: NotebookLMClient, ops: List[Op]) -> List[Any]:
+    """Executes sub-batch in one worker, collecting errors as results."""
+    results: List[Any] = []
+    for op in ops:
+        try:
+            results.append(_run_op(client, op))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+async def submit_mixed(
+    ops: List[Op],
+    client: Optional[NotebookLMClient] = None,
+    batch_size: int = 8,
+    max_inflight: int = 4
+) -> List[Any]:
+    """
+    Executes mixed operations in asynchronous sub-batches.
+
+    NotebookLM has no batch RPC, so a sub-batch is the unit of work given
+    to one worker thread: it keeps per-request dispatch overhead low while
+    max_inflight sub-batches overlap on the network.
+
+    Args:
+        ops: Operations to execute
+        client: Optional NotebookLM client (shared by all workers)
+        batch_size: Number of operations per sub-batch
+        max_inflight: Maximum number of sub-batches running at once
+
+    Returns:
+        Results in the same order as ops. A failed operation yields
+        the exception instead of a result.
+
+    Raises:
+        AuthError: If client not provided and tokens not found
+    """
+    if not ops:
+        return []
+
+    if client is None:
+        ClientFactory().ensure_authenticated()
+        client = get_notebooklm_client()
+        if client is None:
+            # Tokens disappeared after the check (e.g. factory reset)
+            raise AuthError("Tokens not found. Run notebooklm-mcp-auth")
+    open_connection_pool(client)
+
+    # Group operation indices by type, keeping input order inside each group
+    groups: Dict[Type, List[int]] = {phase: [] for phase in _PHASES}
+    for index, op in enumerate(ops):
+        if type(op) not in groups:
+            raise TypeError(f"Unknown operation: {op!r}")
+        groups[type(op)].append(index)
+
+    semaphore = asyncio.Semaphore(max_inflight)
+    results: List[Any] = [None] * len(ops)
+
+    async def run(indices: List[int]):
+        async with semaphore:
+            sub_results = await asyncio.to_thread(
+                _run_sub_batch, client, [ops[i] for i in indices]
+            )
+        for index, result in zip(indices, sub_results):
+            results[index] = result
+
+    for phase in _PHASES:
+        indices = groups[phase]
+        await asyncio.gather(*(
+            run(indices[start:start + batch_size])
+            for start in range(0, len(indices), batch_size)
+        ))
+
+    return results
@@ -10,13 +10,47 @@ Solution:
 - Singleton pattern for a single client instance
 - Lazy initialization (created only on first request)
 - Centralized authentication error handling
+- Thread-safe initialization for concurrent batch queries
 """
 
+import threading
 from typing import Optional
 from notebooklm_mcp.auth import load_cached_tokens
 from notebooklm_mcp.api_client import NotebookLMClient
 
 
+class AuthError(RuntimeError):
+    """Raised when NotebookLM tokens are missing (run notebooklm-mcp-auth)."""
+
+
+def _close_client(client: NotebookLMClient):
+    """Closes client's HTTP connection pool, ignoring clients without one."""
+    close = getattr(client, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception:
+        # Pool may already be closed or broken - nothing left to release
+        pass
+
+
+def open_connection_pool(client: NotebookLMClient):
+    """
+    Creates client's HTTP connection pool before workers share the client.
+    
+    NotebookLMClient builds its httpx.Client lazily on the first request,
+    without a lock, so workers starting together could each build a pool
+    and all but one would leak. Batch entry points call this before
+    fanning out; the pool is created under the factory lock.
+    """
+    get_pool = getattr(client, "_get_client", None)
+    if get_pool is None:
+        return
+    with ClientFactory._lock:
+        get_pool()
+
+
 class ClientFactory:
     """
     Factory for creating and managing NotebookLM clients.
@@ -28,15 +62,27 @@ class ClientFactory:
     - Client contains state (cookies, session_id)
     - Reuse saves resources
     - Avoid multiple token checks
+    
+    The client owns a keep-alive HTTP connection pool, so sharing one
+    client also shares its open TCP/TLS connections between requests.
+    When the client is replaced, its pool is closed explicitly.
+    
+    Initialization uses double-checked locking: the steady-state path
+    is a plain attribute read, the lock is only taken while the
+    instance or client is being created.
     """
     
     _instance: Optional['ClientFactory'] = None
     _client: Optional[NotebookLMClient] = None
+    _auth_ok: Optional[bool] = None
+    _lock = threading.Lock()
     
     def __new__(cls):
         """Singleton: returns a single factory instance."""
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
     
     def get_client(self, force_new: bool = False) -> Optional[NotebookLMClient]:
@@ -53,22 +99,57 @@ class ClientFactory:
             RuntimeError: If tokens not found (can be changed to custom exception)
         """
         # If client already created and new one not required - return existing
-        if self._client is not None and not force_new:
-            return self._client
+        # (local binding: one attribute read on the hot path)
+        client = self._client
+        if client is not None and not force_new:
+            return client
+        
+        with self._lock:
+            # Another thread may have created the client while we waited
+            client = self._client
+            if client is not None and not force_new:
+                return client
+            
+            # Load tokens
+            tokens = load_cached_tokens()
+            if not tokens:
+                return None
+            
+            # Release connections held by the previous client
+            if client is not None:
+                _close_client(client)
+            
+            # Create new client
+            client = NotebookLMClient(
+                cookies=tokens.cookies,
+                csrf_token=tokens.csrf_token,
+                session_id=tokens.session_id
+            )
+            self._client = client
+            
+            return client
+    
+    def ensure_authenticated(self) -> bool:
+        """
+        Checks once that a client can be created from cached tokens.
+        
+        Batch entry points call this before spawning workers, so a
+        missing login fails fast instead of in every worker.
         
-        # Load tokens
-        tokens = load_cached_tokens()
-        if not tokens:
-            return None
+        Returns:
+            True if authenticated
         
-        # Create new client
-        self._client = NotebookLMClient(
-            cookies=tokens.cookies,
-            csrf_token=tokens.csrf_token,
-            session_id=tokens.session_id
-        )
+        Raises:
+            AuthError: If tokens not found
+        """
+        if self._auth_ok:
+            return True
         
-        return self._client
+        if self.get_client() is None:
+            raise AuthError("Tokens not found. Run notebooklm-mcp-auth")
+        
+        self._auth_ok = True
+        return True
     
     def reset(self):
         """
@@ -79,7 +160,11 @@ class ClientFactory:
         - Reconnecting after session expiration
         - Resetting state
         """
-        self._client = None
+        with self._lock:
+            if self._client is not None:
+                _close_client(self._client)
+            self._client = None
+            self._auth_ok = None
     
     @classmethod
     def create_client(cls) -> Optional[NotebookLMClient]:
@@ -112,5 +197,9 @@ def get_notebooklm_client() -> Optional[NotebookLMClient]:
     Returns:
         NotebookLMClient or None
     """
-    return ClientFactory.create_client()
+    return _factory.get_client()
+
 
+# Module-level factory instance: get_notebooklm_client() calls it directly
+# instead of going through ClientFactory.create_client()
+_factory = ClientFactory()
@@ -13,11 +13,49 @@ Solution:
 """
 
 from dataclasses import dataclass
+from functools import cache, lru_cache
 from typing import Optional
+import logging
 import os
 
 
-@dataclass
+# Values treated as "true" for boolean environment variables
+_TRUE = frozenset({"1", "true", "yes", "on"})
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Reads boolean environment variable (1/true/yes/on, case-insensitive)."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in _TRUE
+
+
+def _env_int(name: str, default: int) -> int:
+    """Reads integer environment variable, falling back to default if malformed."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+@lru_cache(maxsize=1024)
+def _build_title(prefix: str, max_len: int, question: str) -> str:
+    """
+    Builds note title from prefix and question.
+    
+    Module-level so it can be memoized: the cache key holds only the
+    values that affect the title, not the whole Config.
+    """
+    question_clean = question.strip()
+    suffix = "..." if len(question_clean) > max_len else ""
+    return f"{prefix} {question_clean[:max_len]}{suffix}"
+
+
+@dataclass(slots=True, frozen=True)
 class Config:
     """
     Application configuration.
@@ -26,6 +64,10 @@ class Config:
     - Automatic generation of __init__, __repr__
     - Field typing
     - Convenient access to settings
+    
+    slots=True gives fast attribute access without instance __dict__,
+    frozen=True prevents accidental mutation of shared configuration
+    (use dataclasses.replace() + set_config() to change settings).
     """
     
     # Note settings
@@ -36,6 +78,11 @@ class Config:
     default_auto_save: bool = True
     default_use_optimization: bool = True
     query_timeout: Optional[int] = None  # None = no timeout
+    use_query_cache: bool = True  # Reuse answers to repeated identical questions
+    top_k_sections: int = 5  # Max sections referenced by optimized queries
+    
+    # Note settings (storage)
+    compress_notes: bool = False  # Strip stopwords from saved note answers
     
     # Output settings
     verbose: bool = True  # Show informational messages
@@ -47,44 +94,99 @@ class Config:
         
         Environment variables:
         - NOTEBOOKLM_NOTE_PREFIX: prefix for notes
+        - NOTEBOOKLM_NOTE_MAX_TITLE: max question length in note title
         - NOTEBOOKLM_AUTO_SAVE: automatic saving (true/false)
+        - NOTEBOOKLM_USE_OPTIMIZATION: query optimization (true/false)
+        - NOTEBOOKLM_QUERY_CACHE: cache repeated query responses (true/false)
+        - NOTEBOOKLM_TOP_K: max sections referenced by optimized queries
+        - NOTEBOOKLM_COMPRESS_NOTES: compress saved note answers (true/false)
         - NOTEBOOKLM_VERBOSE: verbose output (true/false)
         
+        Booleans accept 1/true/yes/on. Malformed numbers fall back to defaults.
+        
         Returns:
             Config with settings from environment or default values
         """
         return cls(
             note_prefix=os.getenv("NOTEBOOKLM_NOTE_PREFIX", "Note:"),
-            note_max_title_length=int(os.getenv("NOTEBOOKLM_NOTE_MAX_TITLE", "50")),
-            default_auto_save=os.getenv("NOTEBOOKLM_AUTO_SAVE", "true").lower() == "true",
-            default_use_optimization=os.getenv("NOTEBOOKLM_USE_OPTIMIZATION", "true").lower() == "true",
-            verbose=os.getenv("NOTEBOOKLM_VERBOSE", "true").lower() == "true",
+            note_max_title_length=_env_int("NOTEBOOKLM_NOTE_MAX_TITLE", 50),
+            default_auto_save=_env_bool("NOTEBOOKLM_AUTO_SAVE", True),
+            default_use_optimization=_env_bool("NOTEBOOKLM_USE_OPTIMIZATION", True),
+            use_query_cache=_env_bool("NOTEBOOKLM_QUERY_CACHE", True),
+            top_k_sections=_env_int("NOTEBOOKLM_TOP_K", 5),
+            compress_notes=_env_bool("NOTEBOOKLM_COMPRESS_NOTES", False),
+            verbose=_env_bool("NOTEBOOKLM_VERBOSE", True),
         )
     
-    def get_note_title(self, question: str) -> str:
+    def get_note_title(self, question: str, prefix_override: Optional[str] = None) -> str:
         """
         Generates note title from question.
         
         Args:
             question: User question
+            prefix_override: Prefix to use instead of note_prefix
         
         Returns:
             Note title with prefix and truncated text
         """
-        question_clean = question.strip()
-        
-        # Truncate to max length
-        if len(question_clean) > self.note_max_title_length:
-            question_title = question_clean[:self.note_max_title_length] + "..."
-        else:
-            question_title = question_clean
-        
-        return f"{self.note_prefix} {question_title}"
+        prefix = prefix_override or self.note_prefix
+        return _build_title(prefix, self.note_max_title_length, question)
 
 
-# Global configuration instance
-# Can be overridden via config.from_env() or create your own instance
-_config: Optional[Config] = None
+# Loggers of this project that print status messages. Only these are
+# configured: the root logger (and with it httpx request logging, whose
+# URLs carry the session id) is left to the application.
+_PROJECT_LOGGERS = ("auto_save_notes", "notebook_template")
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """
+    Default console output for status messages.
+    
+    Records still propagate to the root logger. The handler prints only
+    while the root logger has no handlers, so an application that sets
+    up logging later (even after get_config()) gets every record once,
+    through its own handlers.
+    """
+    
+    def emit(self, record: logging.LogRecord):
+        if not logging.getLogger().handlers:
+            super().emit(record)
+
+
+# Console handler installed by _setup_logging (None until installed)
+_handler: Optional[logging.Handler] = None
+
+
+def _setup_logging(config: Config):
+    """
+    Installs default console logging for status messages.
+    
+    Verbose mode shows informational messages (INFO), otherwise only
+    warnings and errors.
+    """
+    global _handler
+    if _handler is None:
+        _handler = _ConsoleHandler()
+        _handler.setFormatter(logging.Formatter("%(message)s"))
+        for name in _PROJECT_LOGGERS:
+            logging.getLogger(name).addHandler(_handler)
+    
+    level = logging.INFO if config.verbose else logging.WARNING
+    for name in _PROJECT_LOGGERS:
+        logging.getLogger(name).setLevel(level)
+
+
+# Configuration explicitly set via set_config (takes priority over environment)
+_override: Optional[Config] = None
+
+
+@cache
+def _build_config() -> Config:
+    """Builds configuration from environment once and caches it."""
+    config = Config.from_env()
+    _setup_logging(config)
+    return config
 
 
 def get_config() -> Config:
@@ -97,13 +199,10 @@ def get_config() -> Config:
     Returns:
         Config: Configuration instance
     """
-    global _config
-    if _config is None:
-        _config = Config.from_env()
-    return _config
+    return _override or _build_config()
 
 
-def set_config(config: Config):
+def set_config(config: Optional[Config]):
     """
     Sets global configuration.
     
@@ -112,8 +211,10 @@ def set_config(config: Config):
     - Programmatic setting changes
     
     Args:
-        config: Configuration instance
+        config: Configuration instance (None restores configuration from environment)
     """
-    global _config
-    _config = config
-
+    global _override
+    _override = config
+    _build_config.cache_clear()
+    if config is not None:
+        _setup_logging(config)
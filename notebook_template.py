@@ -8,17 +8,36 @@ Architecture:
 - Query templates for efficient search
 """
 
+import asyncio
+import logging
+import string
 import sys
-import json
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from enum import Enum
 from notebooklm_mcp.api_client import NotebookLMClient
-from client_factory import get_notebooklm_client
+from client_factory import get_notebooklm_client, open_connection_pool
 
+log = logging.getLogger(__name__)
 
-class SourceType(Enum):
-    """Source types for better categorization"""
+
+if sys.version_info >= (3, 11):
+    from enum import StrEnum
+else:
+    class StrEnum(str, Enum):
+        """Backport of enum.StrEnum: members are str and format as their value"""
+        
+        def __str__(self) -> str:
+            return self.value
+
+
+class SourceType(StrEnum):
+    """Source types for better categorization (members are plain str values)"""
     DOCUMENTATION = "documentation"
     CODE = "code"
     TUTORIAL = "tutorial"
@@ -27,7 +46,7 @@ class SourceType(Enum):
     EXAMPLES = "examples"
 
 
-@dataclass
+@dataclass(slots=True)
 class SourceMetadata:
     """
     Source metadata for improved indexing and navigation.
@@ -44,15 +63,87 @@ class SourceMetadata:
     source_type: SourceType = SourceType.DOCUMENTATION
     priority: int = 5  # 1-10, where 10 is most important
     related_sections: List[str] = field(default_factory=list)
+    
+    @property
+    def slug(self) -> str:
+        """Identifier derived from title (e.g. "API Reference" -> "api_reference")."""
+        return _slugify(self.title)
+    
+    @property
+    def default_source_id(self) -> str:
+        """Source ID used when NotebookLM response has none."""
+        return f"source_{self.slug}"
+    
+    @property
+    def prefix(self) -> str:
+        """
+        Metadata formatted as prefix for source text.
+        
+        This helps NotebookLM better index content.
+        """
+        return _format_metadata_prefix(
+            self.title,
+            self.category,
+            self.source_type,
+            tuple(self.tags),
+            self.description,
+            tuple(self.related_sections)
+        )
+
+
+# Slug and prefix are pure functions of metadata fields, so they are
+# memoized on the (hashable) field values rather than on the instance
+
+# Lowercases ASCII letters and maps space to underscore in one pass
+_SLUG_TABLE = str.maketrans(string.ascii_uppercase + " ", string.ascii_lowercase + "_")
+
 
+@lru_cache(maxsize=1024)
+def _slugify(title: str) -> str:
+    if title.isascii():
+        return title.translate(_SLUG_TABLE)
+    # Table covers ASCII only; non-ASCII titles need full Unicode lowercasing
+    return title.lower().replace(" ", "_")
 
-@dataclass
+
+@lru_cache(maxsize=256)
+def _format_metadata_prefix(
+    title: str,
+    category: str,
+    source_type: SourceType,
+    tags: Tuple[str, ...],
+    description: str,
+    related_sections: Tuple[str, ...]
+) -> str:
+    lines = [
+        f"# {title}",
+        f"**Category:** {category}",
+        f"**Type:** {source_type}",
+    ]
+    
+    if tags:
+        lines.append(f"**Tags:** {', '.join(tags)}")
+    
+    if description:
+        lines.append(f"**Description:** {description}")
+    
+    if related_sections:
+        lines.append(f"**Related sections:** {', '.join(related_sections)}")
+    
+    lines.append("---\n")
+    return "\n".join(lines)
+
+
+@dataclass(slots=True)
 class NavigationNode:
     """
     Navigation map node.
     
     Used to create hierarchical structure
     that helps MCP make precise queries to specific sections.
+    
+    slots=True: notebooks can hold thousands of nodes, slots drop the
+    per-instance __dict__ and speed up attribute access.
     """
     section_id: str
     title: str
@@ -62,7 +153,7 @@ class NavigationNode:
     source_metadata: Optional[SourceMetadata] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class QueryTemplate:
     """
     Query template for precise navigation.
@@ -78,6 +169,155 @@ class QueryTemplate:
     example: str = ""
 
 
+class _TrieNode:
+    """Keyword trie node: compressed edges keyed by first character."""
+    __slots__ = ("children", "section_ids")
+    
+    def __init__(self) -> None:
+        self.children: Dict[str, Tuple[str, '_TrieNode']] = {}  # first char -> (edge label, child)
+        self.section_ids: Dict[str, None] = {}  # insertion-ordered set
+
+
+class KeywordTrie:
+    """
+    Path-compressed trie (radix tree) over keywords.
+    
+    Allows prefix queries: "auth" finds sections tagged with
+    "authentication", "authorize", "authz" in O(length of prefix)
+    instead of scanning all keywords. Chains of single-child nodes
+    are stored as one edge with a multi-character label.
+    """
+    
+    def __init__(self) -> None:
+        self.root = _TrieNode()
+    
+    def insert(self, keyword: str, section_id: str) -> None:
+        """Adds section ID under keyword."""
+        node = self.root
+        rest = keyword
+        while rest:
+            entry = node.children.get(rest[0])
+            if entry is None:
+                # No edge starting with this char - hang whole remainder as one edge
+                leaf = _TrieNode()
+                node.children[rest[0]] = (rest, leaf)
+                node = leaf
+                break
+            
+            label, child = entry
+            common = 0
+            limit = min(len(label), len(rest))
+            while common < limit and label[common] == rest[common]:
+                common += 1
+            
+            if common < len(label):
+                # Split edge: label[:common] -> middle node -> label[common:]
+                middle = _TrieNode()
+                middle.children[label[common]] = (label[common:], child)
+                node.children[rest[0]] = (label[:common], middle)
+                child = middle
+            
+            node = child
+            rest = rest[common:]
+        
+        node.section_ids[section_id] = None
+    
+    def find_prefix(self, prefix: str) -> List[str]:
+        """
+        Returns section IDs of all keywords starting with prefix.
+        
+        Exact keyword matches come first, then longer keywords.
+        """
+        node = self.root
+        rest = prefix
+        while rest:
+            entry = node.children.get(rest[0])
+            if entry is None:
+                return []
+            label, child = entry
+            if rest.startswith(label):
+                rest = rest[len(label):]
+            elif not label.startswith(rest):
+                return []
+            else:
+                # Prefix ends in the middle of the edge
+                rest = ""
+            node = child
+        
+        # Collect subtree postings, deduplicated in traversal order
+        found: Dict[str, None] = {}
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            found.update(current.section_ids)
+            stack.extend(child for _, child in reversed(current.children.values()))
+        return list(found)
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over keywords.
+    
+    Finds all keyword occurrences in a text in a single pass,
+    O(len(text) + matches) regardless of the number of keywords,
+    instead of probing the index once per keyword or token.
+    
+    Usage:
+        automaton = KeywordAutomaton()
+        automaton.add_word("api", "section_1")
+        automaton.build()
+        for end, length, value in automaton.iter("how to call the api"):
+            ...
+    """
+    
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]  # state -> {char: next state}
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]  # state -> [(keyword length, value)]
+    
+    def add_word(self, word: str, value: str) -> None:
+        """Adds keyword with associated value (call build() afterwards)."""
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append((len(word), value))
+    
+    def build(self) -> None:
+        """Computes failure links (breadth-first over the keyword trie)."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+    
+    def iter(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yields (end index, keyword length, value) for every match in text."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._out[state]:
+                yield index, length, value
+
+
+# Maximum number of cached navigation queries per map
+_QUERY_CACHE_SIZE = 1024
+
+
 class NavigationMap:
     """
     Notebook navigation map.
@@ -88,17 +328,30 @@ class NavigationMap:
     3. Automatically generate navigation queries
     """
     
-    def __init__(self):
+    def __init__(self) -> None:
         self.root_nodes: List[NavigationNode] = []
         self.section_index: Dict[str, NavigationNode] = {}
-        self.keyword_index: Dict[str, List[str]] = {}  # keyword -> [section_ids]
+        # keyword -> {section_id: None}; dict keys act as an insertion-ordered set,
+        # so repeated keywords don't create duplicates and first match stays first
+        self.keyword_index: Dict[str, Dict[str, None]] = defaultdict(dict)
+        self.keyword_trie = KeywordTrie()  # prefix search over the same keywords
+        
+        # Bumped on every change so derived caches can detect staleness
+        self.version = 0
+        self._query_cache: Dict[str, str] = {}  # topic -> navigation query
+        self._automaton: Optional[KeywordAutomaton] = None
+        self._automaton_version = -1
+        
+        # Last inserted (section_id, node): bulk tree construction usually
+        # adds children right after their parent
+        self._last_added: Optional[Tuple[str, NavigationNode]] = None
     
     def add_section(
         self,
         section_id: str,
         title: str,
         description: str,
-        keywords: List[str],
+        keywords: Iterable[str],
         parent_id: Optional[str] = None,
         metadata: Optional[SourceMetadata] = None
     ) -> NavigationNode:
@@ -109,13 +362,19 @@ class NavigationMap:
             section_id: Unique section identifier
             title: Section title
             description: Content description
-            keywords: Search keywords
+            keywords: Search keywords (any iterable, consumed once)
             parent_id: Parent section ID (for hierarchy)
             metadata: Source metadata
         
         Returns:
             Created navigation node
         """
+        # Interned: shared tags, IDs and titles are stored once and compare by identity
+        section_id = sys.intern(section_id)
+        title = sys.intern(title)
+        # Node keeps its own list; this is the only copy made
+        keywords = list(keywords)
+        
         node = NavigationNode(
             section_id=section_id,
             title=title,
@@ -124,15 +383,19 @@ class NavigationMap:
             source_metadata=metadata
         )
         
-        # Index by keywords
-        for keyword in keywords:
-            if keyword.lower() not in self.keyword_index:
-                self.keyword_index[keyword.lower()] = []
-            self.keyword_index[keyword.lower()].append(section_id)
+        # Index by keywords (lowercased once, duplicates collapsed)
+        for keyword in {sys.intern(k.lower()) for k in keywords}:
+            self.keyword_index[keyword][section_id] = None
+            self.keyword_trie.insert(keyword, section_id)
         
         # Add to hierarchy
         if parent_id:
-            parent = self.section_index.get(parent_id)
+            last = self._last_added
+            parent: Optional[NavigationNode]
+            if last is not None and last[0] == parent_id:
+                parent = last[1]
+            else:
+                parent = self.section_index.get(parent_id)
             if parent:
                 parent.children.append(node)
             else:
@@ -142,28 +405,132 @@ class NavigationMap:
             self.root_nodes.append(node)
         
         self.section_index[section_id] = node
+        self._last_added = (section_id, node)
+        
+        self.version += 1
+        self._query_cache.clear()
         return node
     
     def find_sections_by_keyword(self, keyword: str) -> List[NavigationNode]:
-        """Finds sections by keyword"""
+        """
+        Finds sections by keyword or keyword prefix.
+        
+        "auth" matches "auth", "authentication", "authorize"...;
+        sections with exact keyword match come first.
+        """
         keyword_lower = keyword.lower()
-        section_ids = self.keyword_index.get(keyword_lower, [])
+        if not keyword_lower:
+            return []
+        section_ids = self.keyword_trie.find_prefix(keyword_lower)
         return [self.section_index[sid] for sid in section_ids if sid in self.section_index]
     
+    def find_sections_by_all_keywords(self, keywords: Iterable[str]) -> List[NavigationNode]:
+        """
+        Finds sections tagged with every given keyword ("auth" AND "api").
+        
+        Intersection starts from the shortest posting list and probes the
+        others by hash, so cost is bounded by the rarest keyword.
+        
+        Returns:
+            Matching sections in indexing order
+        """
+        postings = []
+        for keyword in keywords:
+            section_ids = self.keyword_index.get(keyword.lower())
+            if not section_ids:
+                return []
+            postings.append(section_ids)
+        if not postings:
+            return []
+        
+        postings.sort(key=len)
+        smallest, rest = postings[0], postings[1:]
+        return [
+            self.section_index[sid]
+            for sid in smallest
+            if sid in self.section_index and all(sid in other for other in rest)
+        ]
+    
+    def find_sections_in_text(self, text: str) -> List[NavigationNode]:
+        """
+        Finds sections whose keywords occur in text (e.g. a whole question).
+        
+        Scans text once with an Aho-Corasick automaton over all keywords;
+        only whole-word matches count ("api" matches "the api", not "rapid").
+        
+        Returns:
+            Matching sections, most keyword hits first
+        """
+        automaton = self._automaton
+        if automaton is None or self._automaton_version != self.version:
+            automaton = KeywordAutomaton()
+            for keyword, section_ids in self.keyword_index.items():
+                for section_id in section_ids:
+                    automaton.add_word(keyword, section_id)
+            automaton.build()
+            self._automaton = automaton
+            self._automaton_version = self.version
+        
+        text_lower = text.lower()
+        hits: Dict[str, int] = {}
+        for end, length, section_id in automaton.iter(text_lower):
+            start = end - length + 1
+            if start > 0 and text_lower[start - 1].isalnum():
+                continue
+            if end + 1 < len(text_lower) and text_lower[end + 1].isalnum():
+                continue
+            hits[section_id] = hits.get(section_id, 0) + 1
+        
+        # sorted() is stable: ties keep order of first occurrence
+        ranked = sorted(hits, key=hits.__getitem__, reverse=True)
+        return [self.section_index[sid] for sid in ranked if sid in self.section_index]
+    
     def generate_navigation_query(self, topic: str) -> str:
         """
         Generates optimized query for navigation.
         
         Format: "In section [section] find information about [topic]"
         This helps NotebookLM precisely identify the relevant section.
+        Results are cached per topic until the map changes.
         """
-        sections = self.find_sections_by_keyword(topic)
-        if not sections:
+        if not self.keyword_index:
             return f"Find information about {topic}"
         
-        # Use first found section for precision
-        section_title = sections[0].title
-        return f"In section '{section_title}' find information about {topic}"
+        query = self._query_cache.get(topic)
+        if query is not None:
+            return query
+        
+        sections = self.find_sections_by_keyword(topic)
+        if not sections:
+            query = f"Find information about {topic}"
+        else:
+            # Use first found section for precision
+            section_title = sections[0].title
+            query = f"In section '{section_title}' find information about {topic}"
+        
+        # Bounded: start over instead of tracking LRU order
+        if len(self._query_cache) >= _QUERY_CACHE_SIZE:
+            self._query_cache.clear()
+        self._query_cache[topic] = query
+        return query
+
+
+# Keys that may hold source ID in add_*_source responses, in priority order
+_ID_KEYS = ('sourceId', 'id')
+
+
+def _extract_source_id(result: Optional[dict]) -> Optional[str]:
+    """Returns first non-empty source ID from client response"""
+    if not result:
+        return None
+    return next((value for key in _ID_KEYS if (value := result.get(key))), None)
+
+
+# Queued source inside buffered_sources: (metadata, source_url, source_text, section_id)
+_PendingSource = Tuple[SourceMetadata, Optional[str], Optional[str], Optional[str]]
+
+# Precomputed indentation for navigation summary levels
+_INDENTS = tuple("  " * level for level in range(16))
 
 
 class NotebookTemplate:
@@ -177,7 +544,7 @@ class NotebookTemplate:
     4. Saves tokens through precise navigation
     """
     
-    def __init__(self, client: Optional[NotebookLMClient] = None):
+    def __init__(self, client: Optional[NotebookLMClient] = None) -> None:
         """
         Initializes notebook template.
         
@@ -192,8 +559,19 @@ class NotebookTemplate:
         
         self.client = client
         self.navigation = NavigationMap()
-        self.query_templates: List[QueryTemplate] = []
+        # Query templates stored as parallel arrays (see add_query_template)
+        self._tpl_names: List[str] = []
+        self._tpl_patterns: List[str] = []
+        self._tpl_targets: List[List[str]] = []
+        self._tpl_examples: List[str] = []
+        self._tpl_index: Dict[str, int] = {}  # name -> position
         self.notebook_id: Optional[str] = None
+        
+        # Source buffering state (see buffered_sources)
+        self._pending: Optional[List[_PendingSource]] = None
+        self._pending_limit = 0
+        self._pending_workers = 1
+        self._flushed_ids: List[Union[str, BaseException]] = []
     
     def create_notebook(self, title: str, description: str = "") -> str:
         """
@@ -214,7 +592,7 @@ class NotebookTemplate:
         
         return notebook.id
     
-    def _add_index_source(self, content: str):
+    def _add_index_source(self, content: str) -> Optional[dict]:
         """Adds index source with structure description"""
         if not self.notebook_id:
             return None
@@ -227,7 +605,7 @@ class NotebookTemplate:
             )
             return result
         except Exception as e:
-            print(f"Warning: Failed to add index source: {e}")
+            log.warning("Failed to add index source: %s", e)
             return None
     
     def add_source_with_metadata(
@@ -247,33 +625,47 @@ class NotebookTemplate:
             section_id: Section ID for navigation
         
         Returns:
-            ID of added source
+            ID of added source (inside buffered_sources: placeholder ID,
+            real IDs are collected in the list yielded by buffered_sources)
         """
         if not self.notebook_id:
             raise RuntimeError("Create notebook first")
+        if not source_text and not source_url:
+            raise ValueError("Must specify either source_text or source_url")
         
-        # Format metadata prefix for better indexing
-        metadata_prefix = self._format_metadata_prefix(metadata)
-        
-        source_id = None
+        if self._pending is not None:
+            # Buffered mode: network call and navigation update are deferred
+            self._pending.append((metadata, source_url, source_text, section_id))
+            if len(self._pending) >= self._pending_limit:
+                self._flush_pending()
+            return metadata.default_source_id
         
-        # Add source
+        source_id = self._submit_source(metadata, source_url, source_text)
+        self._register_section(metadata, section_id)
+        return source_id
+    
+    def _submit_source(
+        self,
+        metadata: SourceMetadata,
+        source_url: Optional[str],
+        source_text: Optional[str]
+    ) -> str:
+        """Sends source to NotebookLM and returns its ID"""
         if source_text:
             # For text sources, add metadata at the beginning
-            full_text = metadata_prefix + "\n\n" + source_text
+            full_text = metadata.prefix + "\n\n" + source_text
             try:
                 result = self.client.add_text_source(
                     notebook_id=self.notebook_id,
                     text=full_text,
                     title=metadata.title
                 )
-                if result:
-                    source_id = result.get('sourceId') or result.get('id') or f"source_{metadata.title.lower().replace(' ', '_')}"
+                source_id = _extract_source_id(result)
             except Exception as e:
-                print(f"Error adding text source: {e}")
+                log.error("Error adding text source: %s", e)
                 raise
         
-        elif source_url:
+        else:
             # For URL sources, metadata only in navigation
             try:
                 result = self.client.add_url_source(
@@ -281,53 +673,172 @@ class NotebookTemplate:
                     url=source_url,
                     title=metadata.title
                 )
-                if result:
-                    source_id = result.get('sourceId') or result.get('id') or f"source_{metadata.title.lower().replace(' ', '_')}"
+                source_id = _extract_source_id(result)
             except Exception as e:
-                print(f"Error adding URL source: {e}")
+                log.error("Error adding URL source: %s", e)
                 raise
-        else:
-            raise ValueError("Must specify either source_text or source_url")
         
-        # Add to navigation
-        section_id = section_id or metadata.title.lower().replace(" ", "_")
+        return source_id or metadata.default_source_id
+    
+    def _register_section(self, metadata: SourceMetadata, section_id: Optional[str]) -> None:
+        """Adds source to navigation map"""
         self.navigation.add_section(
-            section_id=section_id,
+            section_id=section_id or metadata.slug,
             title=metadata.title,
             description=metadata.description,
-            keywords=metadata.tags + [metadata.category],
+            keywords=chain(metadata.tags, (metadata.category,)),
             metadata=metadata
         )
+    
+    async def add_source_with_metadata_async(
+        self,
+        metadata: SourceMetadata,
+        source_url: Optional[str] = None,
+        source_text: Optional[str] = None,
+        section_id: Optional[str] = None
+    ) -> str:
+        """
+        Async version of add_source_with_metadata.
         
-        return source_id or f"source_{metadata.title.lower().replace(' ', '_')}"
+        The client is synchronous, so the network call runs in a worker
+        thread; navigation map is updated after it completes.
+        """
+        if not self.notebook_id:
+            raise RuntimeError("Create notebook first")
+        if not source_text and not source_url:
+            raise ValueError("Must specify either source_text or source_url")
+        
+        source_id = await asyncio.to_thread(self._submit_source, metadata, source_url, source_text)
+        self._register_section(metadata, section_id)
+        return source_id
     
-    def _format_metadata_prefix(self, metadata: SourceMetadata) -> str:
+    async def add_sources(
+        self,
+        items: List[Tuple[SourceMetadata, Optional[str], Optional[str]]],
+        max_concurrency: int = 16
+    ) -> List[Union[str, BaseException]]:
         """
-        Formats metadata as prefix for source.
+        Adds several sources concurrently.
         
-        This helps NotebookLM better index content.
+        Args:
+            items: List of (metadata, source_url, source_text) tuples
+            max_concurrency: Maximum number of sources sent at once
+        
+        Returns:
+            Source IDs in the same order as items; a failed source yields
+            its exception and is not added to navigation map
         """
-        lines = [
-            f"# {metadata.title}",
-            f"**Category:** {metadata.category}",
-            f"**Type:** {metadata.source_type.value}",
-        ]
+        open_connection_pool(self.client)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def add(metadata: SourceMetadata, source_url: Optional[str], source_text: Optional[str]) -> str:
+            async with semaphore:
+                return await self.add_source_with_metadata_async(
+                    metadata,
+                    source_url=source_url,
+                    source_text=source_text
+                )
+        
+        return await asyncio.gather(*(add(*item) for item in items), return_exceptions=True)
+    
+    @contextmanager
+    def buffered_sources(
+        self,
+        max_batch: int = 64,
+        max_workers: int = 8
+    ) -> Iterator[List[Union[str, BaseException]]]:
+        """
+        Buffers add_source_with_metadata calls and sends them in batches.
+        
+        Inside the block sources are queued instead of being sent one by one;
+        the queue is flushed concurrently when it reaches max_batch and on
+        exit. A source enters the navigation map only after it was sent
+        successfully (same as add_sources).
+        
+        Usage:
+            with template.buffered_sources() as source_ids:
+                for metadata, text in sources:
+                    template.add_source_with_metadata(metadata, source_text=text)
+            # source_ids now holds IDs of added sources in order
+        
+        Args:
+            max_batch: Queue size that triggers a flush
+            max_workers: Maximum number of sources sent in parallel
+        
+        Yields:
+            List that receives source IDs as batches are flushed, in the
+            order sources were added; a failed source yields its exception.
+            If the block raises, sources still queued are neither sent
+            nor added to navigation map.
+        """
+        if self._pending is not None:
+            raise RuntimeError("Source buffering is already active")
         
-        if metadata.tags:
-            lines.append(f"**Tags:** {', '.join(metadata.tags)}")
+        self._pending = []
+        self._pending_limit = max_batch
+        self._pending_workers = max_workers
+        self._flushed_ids = []
+        try:
+            yield self._flushed_ids
+            self._flush_pending()
+        finally:
+            self._pending = None
+    
+    def _flush_pending(self) -> None:
+        """Sends queued sources concurrently (NotebookLM has no batch endpoint)"""
+        items, self._pending = self._pending, []
+        if not items:
+            return
+        
+        def submit(item: _PendingSource) -> Union[str, BaseException]:
+            metadata, source_url, source_text, _ = item
+            try:
+                return self._submit_source(metadata, source_url, source_text)
+            except Exception as e:
+                return e
         
-        if metadata.description:
-            lines.append(f"**Description:** {metadata.description}")
+        open_connection_pool(self.client)
+        with ThreadPoolExecutor(max_workers=min(self._pending_workers, len(items))) as executor:
+            results = list(executor.map(submit, items))
         
-        if metadata.related_sections:
-            lines.append(f"**Related sections:** {', '.join(metadata.related_sections)}")
+        # Only sources that were actually added enter the navigation map
+        for (metadata, _, _, section_id), result in zip(items, results):
+            if not isinstance(result, BaseException):
+                self._register_section(metadata, section_id)
+        self._flushed_ids.extend(results)
+    
+    def add_query_template(self, template: QueryTemplate) -> None:
+        """
+        Adds query template for standardization.
         
-        lines.append("---\n")
-        return "\n".join(lines)
+        Fields go into parallel arrays: name scans touch only the names
+        list, and lookup by name is a single dict probe.
+        """
+        self._tpl_index[template.name] = len(self._tpl_names)
+        self._tpl_names.append(template.name)
+        self._tpl_patterns.append(template.pattern)
+        self._tpl_targets.append(template.target_sections)
+        self._tpl_examples.append(template.example)
     
-    def add_query_template(self, template: QueryTemplate):
-        """Adds query template for standardization"""
-        self.query_templates.append(template)
+    def get_query_template(self, name: str) -> Optional[QueryTemplate]:
+        """Returns query template by name (last added wins) or None"""
+        index = self._tpl_index.get(name)
+        if index is None:
+            return None
+        return self._make_template(index)
+    
+    @property
+    def query_templates(self) -> List[QueryTemplate]:
+        """Query templates in insertion order (built on access)"""
+        return [self._make_template(i) for i in range(len(self._tpl_names))]
+    
+    def _make_template(self, index: int) -> QueryTemplate:
+        return QueryTemplate(
+            name=self._tpl_names[index],
+            pattern=self._tpl_patterns[index],
+            target_sections=self._tpl_targets[index],
+            example=self._tpl_examples[index]
+        )
     
     def generate_optimized_query(
         self,
@@ -344,6 +855,10 @@ class NotebookTemplate:
         Returns:
             Optimized query for NotebookLM
         """
+        # Nothing indexed yet - no section can match, send question as is
+        if not self.navigation.keyword_index:
+            return question
+        
         if use_section_hint:
             # Try to find relevant section
             query = self.navigation.generate_navigation_query(question)
@@ -357,21 +872,24 @@ class NotebookTemplate:
         
         Used for creating index source.
         """
-        lines = ["# Notebook navigation map\n"]
-        
-        def format_node(node: NavigationNode, level: int = 0):
-            indent = "  " * level
-            lines.append(f"{indent}- **{node.title}** ({node.section_id})")
+        return "".join(self._iter_summary_pieces())
+    
+    def _iter_summary_pieces(self) -> Iterator[str]:
+        """Yields navigation summary pieces (joined once by the caller)"""
+        yield "# Notebook navigation map\n"
+        
+        # Iterative DFS: children pushed in reverse so they pop in order
+        stack = [(node, 0) for node in reversed(self.navigation.root_nodes)]
+        while stack:
+            node, level = stack.pop()
+            indent = _INDENTS[level] if level < len(_INDENTS) else "  " * level
+            # Each line is preceded by newline; the closing "\n" leaves a
+            # blank line after the node block (no empty-line sentinel needed)
+            yield f"\n{indent}- **{node.title}** ({node.section_id})"
             if node.description:
-                lines.append(f"{indent}  {node.description}")
+                yield f"\n{indent}  {node.description}"
             if node.keywords:
-                lines.append(f"{indent}  Keywords: {', '.join(node.keywords)}")
-            lines.append("")
+                yield f"\n{indent}  Keywords: {', '.join(node.keywords)}"
+            yield "\n"
             
-            for child in node.children:
-                format_node(child, level + 1)
-        
-        for node in self.navigation.root_nodes:
-            format_node(node)
-        
-        return "\n".join(lines)
+            stack.extend((child, level + 1) for child in reversed(node.children))
@@ -5,12 +5,50 @@ Principles:
 - Using navigation map for precise positioning
 - Query templates for standardization
 - Token minimization through specific section references
+- Static prefix first, dynamic fields (section, question) at the tail,
+  so consecutive queries share the longest possible common prefix
 """
 
-from typing import List, Optional, Dict
+import hashlib
+import re
+from typing import FrozenSet, List, Optional, Dict, Tuple
 from notebook_template import NavigationMap, QueryTemplate, NotebookTemplate
 
 
+# Stable instructions shared by every built query. Must not contain
+# per-query data: anything variable goes after it.
+QUERY_PREAMBLE = (
+    "Answer using only the notebook sources. "
+    "Be concise and name the section the answer comes from."
+)
+
+# Query patterns, compiled once at import (bound str.format methods)
+_SECTION_FMT = (QUERY_PREAMBLE + "\nSECTION: {title}\nQUESTION: {question}").format
+_QUESTION_FMT = (QUERY_PREAMBLE + "\nQUESTION: {question}").format
+_MULTI_SECTION_FMT = (QUERY_PREAMBLE + "\n{pack}QUESTION: {question}").format
+_NAV_PACK_HEADER = "SECTIONS:\n"
+
+# Batch queries: numbered questions, answers separated by marker lines
+_BATCH_HEADER = (
+    QUERY_PREAMBLE + "\n"
+    "Answer each question independently. Start every answer with its "
+    "marker line, e.g. '### ANSWER 1'.\n"
+)
+_WORD_RE = re.compile(r"\w+")
+# Context fragments for follow-up deltas: sentences and lines
+_FRAGMENT_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+# Only the exact marker line requested in _BATCH_HEADER: prose such as
+# "Answer 2 is preferred" must not split answers
+_BATCH_MARKER_RE = re.compile(r"^### ANSWER (\d+)[ \t]*$", re.MULTILINE)
+_COMPARISON_FMT = (QUERY_PREAMBLE + "\nQUESTION: Compare {topic1} and {topic2}").format
+_IN_SECTION_FMT = (QUERY_PREAMBLE + "\nSECTION: {title}\nQUESTION: Compare {topic1} and {topic2}").format
+_FOLLOWUP_FMT = (QUERY_PREAMBLE + "\nCONTEXT: {context}\nQUESTION: {question}").format
+_FOLLOWUP_SAME_FMT = (QUERY_PREAMBLE + "\nCONTEXT: (previous context unchanged)\nQUESTION: {question}").format
+_FOLLOWUP_DELTA_FMT = (
+    QUERY_PREAMBLE + "\nCONTEXT: (previous context unchanged + delta: {delta})\nQUESTION: {question}"
+).format
+
+
 class QueryBuilder:
     """
     Query builder for efficient navigation.
@@ -21,9 +59,129 @@ class QueryBuilder:
     3. Query formulation optimization for token savings
     """
     
-    def __init__(self, template: NotebookTemplate):
+    def __init__(
+        self,
+        template: NotebookTemplate,
+        navigation: Optional[NavigationMap] = None
+    ) -> None:
+        """
+        Args:
+            template: Notebook template
+            navigation: Navigation map to use instead of template.navigation
+        """
         self.template = template
-        self.navigation = template.navigation
+        self.navigation = navigation if navigation is not None else template.navigation
+        
+        # Parallel arrays over sections (IDs, titles, lowercase title words),
+        # rebuilt lazily when the navigation map version changes: lookups
+        # touch a title string instead of a whole NavigationNode
+        self._section_ids: List[str] = []
+        self._section_titles: List[str] = []
+        self._title_words: List[FrozenSet[str]] = []
+        self._id_to_idx: Dict[str, int] = {}
+        # Navigation packs by section ID list
+        self._nav_packs: Dict[Tuple[str, ...], str] = {}
+        # Navigation map version the arrays and packs were built for
+        self._nav_version = -1
+        # Follow-up context sent in the current conversation, by fragment hash
+        self._followup_conversation_id: Optional[str] = None
+        self._last_context_hash: Optional[str] = None
+        self._context_fragments: Dict[str, str] = {}
+    
+    def _sync_navigation(self) -> None:
+        """Rebuilds section arrays and drops packs if navigation map changed."""
+        navigation = self.navigation
+        if self._nav_version == navigation.version:
+            return
+        
+        index = navigation.section_index
+        self._section_ids = list(index)
+        self._section_titles = [node.title for node in index.values()]
+        self._title_words = [
+            frozenset(_WORD_RE.findall(title.lower())) for title in self._section_titles
+        ]
+        self._id_to_idx = {sid: i for i, sid in enumerate(self._section_ids)}
+        self._nav_packs.clear()
+        self._nav_version = navigation.version
+    
+    def _section_title(self, section_id: str) -> Optional[str]:
+        """Returns section title or None if section is unknown."""
+        self._sync_navigation()
+        idx = self._id_to_idx.get(section_id)
+        return None if idx is None else self._section_titles[idx]
+    
+    def _build_nav_pack(self, section_ids: List[str]) -> str:
+        """
+        Builds navigation pack for a list of sections.
+        
+        Sections are rendered as "- title" lines in the given order (the
+        relevance order of select_top_k_sections), so the same top-K
+        result always yields byte-identical text. Packs are cached until
+        the navigation map changes.
+        
+        Args:
+            section_ids: Section IDs (unknown and repeated IDs are skipped)
+        
+        Returns:
+            Pack text, or "" if no section is known
+        """
+        self._sync_navigation()
+        
+        key = tuple(section_ids)
+        pack = self._nav_packs.get(key)
+        if pack is not None:
+            return pack
+        
+        titles = self._section_titles
+        id_to_idx = self._id_to_idx
+        # One dict lookup per section: filter and title fetch fused via walrus
+        lines = "".join(
+            f"- {titles[idx]}\n" for sid in dict.fromkeys(key)
+            if (idx := id_to_idx.get(sid)) is not None
+        )
+        pack = _NAV_PACK_HEADER + lines if lines else ""
+        self._nav_packs[key] = pack
+        return pack
+    
+    def select_top_k_sections(self, question: str, k: int = 5) -> List[str]:
+        """
+        Selects up to k sections most relevant to the question.
+        
+        Sections whose keywords occur in the question come first (most
+        keyword hits first), remaining slots go to sections sharing the
+        most words with the question in their title.
+        
+        Args:
+            question: User question
+            k: Maximum number of sections
+        
+        Returns:
+            Section IDs, most relevant first (empty if nothing matches)
+        """
+        if k <= 0 or not self.navigation.section_index:
+            return []
+        
+        selected = [
+            node.section_id for node in self.navigation.find_sections_in_text(question)[:k]
+        ]
+        if len(selected) == k:
+            return selected
+        
+        self._sync_navigation()
+        words = set(_WORD_RE.findall(question.lower()))
+        chosen = set(selected)
+        scored = []
+        for section_id, title_words in zip(self._section_ids, self._title_words):
+            if section_id in chosen:
+                continue
+            overlap = len(words & title_words)
+            if overlap:
+                scored.append((overlap, section_id))
+        
+        # sorted() is stable: ties keep section insertion order
+        scored.sort(key=lambda item: item[0], reverse=True)
+        selected.extend(section_id for _, section_id in scored[:k - len(selected)])
+        return selected
     
     def build_section_query(
         self,
@@ -33,7 +191,8 @@ class QueryBuilder:
         """
         Builds query with specific section reference.
         
-        Format: "In section [section] find [question]"
+        Format: QUERY_PREAMBLE, then "SECTION: [section]" and
+        "QUESTION: [question]" lines
         
         Why this is efficient:
         - NotebookLM immediately knows where to look
@@ -42,13 +201,23 @@ class QueryBuilder:
         """
         if section_hint:
             # Use explicit section hint
-            section = self.navigation.section_index.get(section_hint)
-            if section:
-                return f"In section '{section.title}' find: {question}"
+            title = self._section_title(section_hint)
+            if title is not None:
+                return _SECTION_FMT(title=title, question=question)
+        
+        # Automatically determine section by keywords: one Aho-Corasick pass
+        # over the question, the section with most keyword hits wins
+        matches = self.navigation.find_sections_in_text(question)
+        if matches:
+            return _SECTION_FMT(title=matches[0].title, question=question)
         
-        # Automatically determine section by keywords
-        optimized = self.template.generate_optimized_query(question, use_section_hint=True)
-        return optimized
+        # Keyword prefix match (as generate_navigation_query does), emitted
+        # in this builder's SECTION/QUESTION layout
+        if self.navigation.keyword_index:
+            sections = self.navigation.find_sections_by_keyword(question)
+            if sections:
+                return _SECTION_FMT(title=sections[0].title, question=question)
+        return _QUESTION_FMT(question=question)
     
     def build_multi_section_query(
         self,
@@ -59,18 +228,16 @@ class QueryBuilder:
         Builds query for multiple sections.
         
         Used when information may be in different places.
-        """
-        section_titles = [
-            self.navigation.section_index[sid].title
-            for sid in section_ids
-            if sid in self.navigation.section_index
-        ]
         
-        if not section_titles:
-            return question
+        Sections are emitted as a navigation pack (see _build_nav_pack):
+        the same section list gives the same text, so only the question
+        differs between queries over it.
+        """
+        pack = self._build_nav_pack(section_ids)
+        if not pack:
+            return _QUESTION_FMT(question=question)
         
-        sections_str = ", ".join([f"'{title}'" for title in section_titles])
-        return f"In sections {sections_str} find: {question}"
+        return _MULTI_SECTION_FMT(pack=pack, question=question)
     
     def build_comparison_query(
         self,
@@ -83,66 +250,187 @@ class QueryBuilder:
         
         Optimized to get only relevant parts.
         """
-        base_query = f"Compare {topic1} and {topic2}"
-        
         if section_id:
-            section = self.navigation.section_index.get(section_id)
-            if section:
-                return f"In section '{section.title}' {base_query}"
+            title = self._section_title(section_id)
+            if title is not None:
+                return _IN_SECTION_FMT(title=title, topic1=topic1, topic2=topic2)
         
-        return base_query
+        return _COMPARISON_FMT(topic1=topic1, topic2=topic2)
     
     def build_followup_query(
         self,
         previous_context: str,
-        new_question: str
+        new_question: str,
+        conversation_id: Optional[str] = None
     ) -> str:
         """
         Builds follow-up query considering previous context.
         
         Important for maintaining dialog context without reloading data.
+        
+        NotebookLM starts a new conversation on every query unless a
+        conversation ID is passed, so by default the whole context is sent.
+        When the caller continues one conversation (passing the same
+        conversation_id here and to the client), later turns send only
+        fragments (sentences/lines) added since the previous turn, or mark
+        an identical context as unchanged. A context that lost or
+        reordered fragments is sent in full again.
+        
+        Args:
+            previous_context: Dialog context so far
+            new_question: Follow-up question
+            conversation_id: NotebookLM conversation the query continues
         """
-        return f"Considering previous context about {previous_context}, {new_question}"
+        if conversation_id is None:
+            return _FOLLOWUP_FMT(context=previous_context, question=new_question)
+        
+        if conversation_id != self._followup_conversation_id:
+            self.reset_followup_context()
+            self._followup_conversation_id = conversation_id
+        
+        context_hash = _fragment_hash(previous_context)
+        if context_hash == self._last_context_hash:
+            return _FOLLOWUP_SAME_FMT(question=new_question)
+        
+        fragments: Dict[str, str] = {}
+        for fragment in _FRAGMENT_SPLIT_RE.split(previous_context):
+            fragment = fragment.strip()
+            if fragment:
+                fragments[_fragment_hash(fragment)] = fragment
+        
+        sent = self._context_fragments
+        first_turn = self._last_context_hash is None
+        self._last_context_hash = context_hash
+        self._context_fragments = fragments
+        
+        delta = [fragment for key, fragment in fragments.items() if key not in sent]
+        # Delta only if every fragment sent before is still there
+        if first_turn or not delta or not sent.keys() <= fragments.keys():
+            return _FOLLOWUP_FMT(context=previous_context, question=new_question)
+        return _FOLLOWUP_DELTA_FMT(delta=" ".join(delta), question=new_question)
+    
+    def reset_followup_context(self) -> None:
+        """Forgets context sent by build_followup_query (new dialog)."""
+        self._followup_conversation_id = None
+        self._last_context_hash = None
+        self._context_fragments = {}
+
+
+def _fragment_hash(text: str) -> str:
+    """Short stable hash of context text."""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def build_batch_query(questions: List[str]) -> str:
+    """
+    Builds single query that asks several questions at once.
+    
+    The preamble is sent once for all questions instead of once per query.
+    Answers are expected after "### ANSWER n" marker lines, see
+    split_batch_answer().
+    
+    Args:
+        questions: Questions to ask
+    
+    Returns:
+        Combined query text
+    """
+    return _BATCH_HEADER + "".join(
+        f"{i}) {question}\n" for i, question in enumerate(questions, 1)
+    )
+
 
+def split_batch_answer(answer: str, count: int) -> List[Optional[str]]:
+    """
+    Splits response to build_batch_query() into per-question answers.
+    
+    Args:
+        answer: Answer text returned by NotebookLM
+        count: Number of questions in the batch
+    
+    Returns:
+        List of answers in question order (None where marker is missing)
+    """
+    answers: List[Optional[str]] = [None] * count
+    markers = list(_BATCH_MARKER_RE.finditer(answer))
+    
+    if not markers:
+        # Single question answered without marker - whole text is the answer
+        if count == 1 and answer.strip():
+            answers[0] = answer.strip()
+        return answers
+    
+    ends = [m.start() for m in markers[1:]] + [len(answer)]
+    for marker, end in zip(markers, ends):
+        slot = int(marker.group(1)) - 1
+        text = answer[marker.end():end].strip()
+        if 0 <= slot < count and text and answers[slot] is None:
+            answers[slot] = text
+    return answers
+
+
+# Standard query templates: static, so built once at import.
+# Name lookup goes through a dict index instead of scanning the list.
+_QUERY_TEMPLATES: Tuple[QueryTemplate, ...] = (
+    QueryTemplate(
+        name="section_lookup",
+        pattern=QUERY_PREAMBLE + "\nSECTION: {section}\nQUESTION: Find information about {topic}",
+        example=QUERY_PREAMBLE + "\nSECTION: API Reference\nQUESTION: Find information about authenticate method"
+    ),
+    QueryTemplate(
+        name="comparison",
+        pattern=QUERY_PREAMBLE + "\nSECTION: {section}\nQUESTION: Compare {topic1} and {topic2}",
+        example=QUERY_PREAMBLE + "\nSECTION: HTTP Methods\nQUESTION: Compare GET and POST methods"
+    ),
+    QueryTemplate(
+        name="example_search",
+        pattern=QUERY_PREAMBLE + "\nQUESTION: Find examples of {topic} usage",
+        example=QUERY_PREAMBLE + "\nQUESTION: Find examples of OAuth authentication usage"
+    ),
+    QueryTemplate(
+        name="definition",
+        pattern=QUERY_PREAMBLE + "\nSECTION: {section}\nQUESTION: What is {term}?",
+        example=QUERY_PREAMBLE + "\nSECTION: Express.js\nQUESTION: What is middleware?"
+    ),
+)
+
+_TEMPLATE_INDEX: Dict[str, QueryTemplate] = {t.name: t for t in _QUERY_TEMPLATES}
 
-def create_query_templates() -> List[QueryTemplate]:
+
+def create_query_templates() -> Tuple[QueryTemplate, ...]:
     """
-    Creates standard query templates.
+    Returns standard query templates.
     
     Templates help:
     - Standardize query format
     - Teach system effective patterns
     - Simplify query generation
+    
+    Templates are built once at import; the tuple is shared and immutable.
     """
-    return [
-        QueryTemplate(
-            name="section_lookup",
-            pattern="In section '{section}' find information about {topic}",
-            example="In section 'API Reference' find information about authenticate method"
-        ),
-        QueryTemplate(
-            name="comparison",
-            pattern="Compare {topic1} and {topic2} in section '{section}'",
-            example="Compare GET and POST methods in section 'HTTP Methods'"
-        ),
-        QueryTemplate(
-            name="example_search",
-            pattern="Find examples of {topic} usage",
-            example="Find examples of OAuth authentication usage"
-        ),
-        QueryTemplate(
-            name="definition",
-            pattern="What is {term} in context of {section}?",
-            example="What is middleware in context of Express.js?"
-        )
-    ]
+    return _QUERY_TEMPLATES
+
+
+def get_template(name: str) -> Optional[QueryTemplate]:
+    """
+    Returns standard query template by name in O(1).
+    
+    Args:
+        name: Template name (e.g. "section_lookup")
+    
+    Returns:
+        QueryTemplate or None if no such template
+    """
+    return _TEMPLATE_INDEX.get(name)
 
 
 # Usage example
 if __name__ == "__main__":
     # TODO: Implement full example after notebook creation
     print("QueryBuilder ready to use")
-    print("Template examples:")
+    print(f"Preamble: {QUERY_PREAMBLE}")
+    print("Template examples (after preamble):")
     for template in create_query_templates():
-        print(f"  - {template.name}: {template.example}")
+        example = template.example[len(QUERY_PREAMBLE) + 1:].replace("\n", " | ")
+        print(f"  - {template.name}: {example}")
 
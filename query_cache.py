@@ -0,0 +1,155 @@
+"""
+Cache for NotebookLM query responses.
+
+Problem it solves:
+- Repeated identical questions (retries, tool-use loops) hit NotebookLM every time
+- Each query is a multi-second network round-trip
+
+Solution:
+- Exact-match cache keyed by (notebook_id, question hash)
+- Entries expire after TTL so answers don't get stale
+- LRU eviction bounds memory usage
+- Lock makes the cache safe for concurrent batch queries
+- Optional disk cache keeps answers between CLI runs
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+def make_query_key(notebook_id: str, question: str) -> Tuple[str, str]:
+    """
+    Builds cache key for a query.
+
+    The question is hashed so long prompts don't bloat the key.
+
+    Args:
+        notebook_id: Notebook ID
+        question: Question for query
+
+    Returns:
+        Hashable cache key
+    """
+    digest = hashlib.blake2b(question.encode(), digest_size=16).hexdigest()
+    return notebook_id, digest
+
+
+def make_disk_key(notebook_id: str, prompt: str) -> str:
+    """
+    Builds disk cache key (file name stem) for a query.
+
+    Args:
+        notebook_id: Notebook ID
+        prompt: Exact query text sent to NotebookLM
+
+    Returns:
+        sha256 hex digest of notebook ID and prompt
+    """
+    return hashlib.sha256(f"{notebook_id}\0{prompt}".encode()).hexdigest()
+
+
+class TTLCache:
+    """
+    In-memory LRU cache with per-entry expiration.
+
+    Uses OrderedDict for LRU order: hits are moved to the end,
+    the oldest entry is evicted when maxsize is exceeded.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 300):
+        """
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Entry lifetime in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns cached value or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Stores value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Removes all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    Persistent cache of query answers, one JSON file per entry.
+
+    Survives process restarts, so re-running the same CLI query
+    (e.g. while tuning a prompt) does not call NotebookLM again.
+    Entries expire by file age; unreadable files count as misses.
+    The directory is created 0700 and entries are written 0600.
+    """
+
+    def __init__(self, directory: str = "~/.notebooklm/query_cache", ttl: float = 24 * 3600):
+        """
+        Args:
+            directory: Cache directory (created on first write)
+            ttl: Entry lifetime in seconds
+        """
+        self.directory = os.path.expanduser(directory)
+        self.ttl = ttl
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns cached value or None if missing, expired or unreadable."""
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                os.remove(path)
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)["value"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key: str, value: Any):
+        """Stores JSON-serializable value (write is atomic; errors are ignored)."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            # Answers come from private notebooks: owner-only directory and files
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump({"value": value}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            # Cache is best-effort: a failed write only costs a future query
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
@@ -8,20 +8,52 @@ Used for:
 4. Automatically saving responses as notes
 """
 
+import argparse
+import asyncio
 import sys
-import json
-from typing import Optional
-from notebooklm_mcp.api_client import NotebookLMClient
-from query_builder import QueryBuilder
-from notebook_template import NotebookTemplate
-from auto_save_notes import query_and_save, save_answer_as_note
-from client_factory import get_notebooklm_client
-from config import get_config
-
-
-def list_notebooks():
-    """Lists all notebooks"""
-    client = get_notebooklm_client()
+import threading
+import traceback
+from dataclasses import replace
+from typing import TYPE_CHECKING, List, Optional
+from config import Config, get_config, set_config
+from query_cache import DiskCache, make_disk_key
+
+# Client stack (notebooklm_mcp, httpx) is imported inside the functions
+# that talk to NotebookLM, so usage errors and cache hits start fast
+if TYPE_CHECKING:
+    from notebooklm_mcp.api_client import NotebookLMClient
+    from query_builder import QueryBuilder
+
+
+# Separator lines, built once
+SEP_EQ = "=" * 60
+SEP_DASH = "-" * 60
+
+
+def _write(*lines: str):
+    """
+    Writes lines to stdout in one call.
+    
+    One write per block instead of one print per line; answers printed
+    from background queries also can't interleave with other output.
+    """
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Answers to exact repeated queries, kept between runs (24h TTL)
+_DISK_CACHE = DiskCache()
+
+
+def list_notebooks(client: Optional['NotebookLMClient'] = None):
+    """
+    Lists all notebooks
+    
+    Args:
+        client: Optional NotebookLM client (if not provided, shared one is used)
+    """
+    if client is None:
+        from client_factory import get_notebooklm_client
+        client = get_notebooklm_client()
     if not client:
         print("❌ Error: Tokens not found. Run notebooklm-mcp-auth")
         return None
@@ -34,7 +66,10 @@ def query_notebook_direct(
     notebook_id: str, 
     question: str, 
     use_optimization: Optional[bool] = None,
-    auto_save: Optional[bool] = None
+    auto_save: Optional[bool] = None,
+    client: Optional['NotebookLMClient'] = None,
+    config: Optional[Config] = None,
+    builder: Optional['QueryBuilder'] = None
 ):
     """
     Direct query to notebook via API with automatic response saving.
@@ -44,178 +79,437 @@ def query_notebook_direct(
         question: Question for query
         use_optimization: Use optimization via navigation (default from configuration)
         auto_save: Automatically save response as note (default from configuration)
+        client: Optional NotebookLM client (callers making several queries
+            pass the one they already hold)
+        config: Optional configuration (if not provided, global one is used)
+        builder: Optional QueryBuilder over the notebook structure. With
+            optimization enabled, the query references only the top-K
+            sections relevant to the question (config.top_k_sections)
+    
+    Repeated identical queries are answered from a disk cache (24h TTL)
+    without calling NotebookLM; disabled by config.use_query_cache=False
+    (CLI: --no-cache). Only the query response is cached: the note is
+    still saved whenever saving is requested.
     
     Returns:
-        Response from NotebookLM (and source ID if auto_save=True)
+        Answer text from NotebookLM or None on error
     """
-    config = get_config()
-    client = get_notebooklm_client()
-    
-    if not client:
-        print("❌ Error: Tokens not found")
-        return None
+    if config is None:
+        config = get_config()
     
     # Use values from parameters or configuration
     should_optimize = use_optimization if use_optimization is not None else config.default_use_optimization
     should_save = auto_save if auto_save is not None else config.default_auto_save
     
-    # If using optimization, try to load structure
+    # If using optimization, point the query at the most relevant sections
+    query = question
     if should_optimize:
-        # TODO: Load notebook structure from saved file
-        # For now just use question as is, but with optimization hint
-        if config.verbose:
+        if builder is not None:
+            section_ids = builder.select_top_k_sections(question, k=config.top_k_sections)
+            if section_ids:
+                query = builder.build_multi_section_query(question, section_ids)
+        elif config.verbose:
+            # TODO: Load notebook structure from saved file
             print("💡 Tip: Use format 'In section [name] find [topic]' to save tokens")
     
-    # Use function with auto-save if enabled
+    cache_key = make_disk_key(notebook_id, query) if config.use_query_cache else None
+    answer = _DISK_CACHE.get(cache_key) if cache_key is not None else None
+    if answer is not None:
+        if config.verbose:
+            print("💾 Answer from cache")
+        if not should_save:
+            return answer
+    
+    import httpx
+    from notebooklm_mcp.api_client import AuthenticationError
+    from auto_save_notes import answer_text, extract_answer, query_response, save_answer_as_note
+    from client_factory import get_notebooklm_client
+    
+    if client is None:
+        client = get_notebooklm_client()
+    
+    if not client:
+        print("❌ Error: Tokens not found")
+        return None
+    
+    text = answer
+    if answer is None:
+        try:
+            response = query_response(client, notebook_id, query, config)
+        except (httpx.HTTPError, TimeoutError, AuthenticationError) as e:
+            # Network failures and expired cookies are expected;
+            # anything else is a bug and propagates
+            print(f"❌ Error during query: {e}")
+            return None
+        
+        answer = extract_answer(response)
+        # Only a real answer is cached or saved, never the str(response) fallback
+        text = answer_text(response)
+        if text and cache_key is not None:
+            _DISK_CACHE.set(cache_key, text)
+    
+    # Note is titled with the user's question, not the built query
+    if should_save and text:
+        save_answer_as_note(notebook_id, question, text, client=client, config=config)
+    return answer
+
+
+def query_notebook_batch(
+    notebook_id: str,
+    questions: List[str],
+    auto_save: Optional[bool] = None,
+    client: Optional['NotebookLMClient'] = None,
+    config: Optional[Config] = None
+) -> Optional[List[Optional[str]]]:
+    """
+    Asks several questions in a single NotebookLM query.
+    
+    Questions are numbered in one prompt (see build_batch_query) and the
+    response is split back into per-question answers, so N questions cost
+    one round-trip and one preamble instead of N.
+    
+    Args:
+        notebook_id: Notebook ID
+        questions: Questions for query
+        auto_save: Save each answer as note (default from configuration)
+        client: Optional NotebookLM client
+        config: Optional configuration (if not provided, global one is used)
+    
+    Returns:
+        Answers in question order (None for unanswered questions),
+        or None on error
+    """
+    if not questions:
+        return []
+    
+    import httpx
+    from notebooklm_mcp.api_client import AuthenticationError
+    from auto_save_notes import extract_answer, save_answers_as_notes
+    from client_factory import get_notebooklm_client
+    from query_builder import build_batch_query, split_batch_answer
+    
+    if config is None:
+        config = get_config()
+    if client is None:
+        client = get_notebooklm_client()
+    
+    if not client:
+        print("❌ Error: Tokens not found")
+        return None
+    
+    should_save = auto_save if auto_save is not None else config.default_auto_save
+    
+    try:
+        response = client.query(notebook_id, build_batch_query(questions))
+    except (httpx.HTTPError, TimeoutError, AuthenticationError) as e:
+        print(f"❌ Error during query: {e}")
+        return None
+    
+    answers = split_batch_answer(extract_answer(response) or "", len(questions))
+    
     if should_save:
-        answer, source_id = query_and_save(
-            notebook_id=notebook_id,
-            question=question,
-            client=client,
-            auto_save=True
-        )
-        return answer
+        items = [(q, a) for q, a in zip(questions, answers) if a]
+        if items:
+            save_answers_as_notes(notebook_id, items, client=client, config=config)
+    
+    return answers
+
+
+def _read_questions(path: str) -> List[str]:
+    """Reads questions one per line from file ("-" for stdin), skipping blanks."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+def _run_one_query(
+    client: 'NotebookLMClient',
+    config: Config,
+    notebook_id: str,
+    question: str,
+    auto_save: bool
+) -> Optional[str]:
+    """
+    Runs single query without any console input.
+    
+    Interactive modes call it per question; scripts and throughput tests
+    can call it directly.
+    
+    Returns:
+        Answer text or None on error
+    """
+    return query_notebook_direct(
+        notebook_id, question,
+        auto_save=auto_save, client=client, config=config
+    )
+
+
+def _print_answer(question: str, response: Optional[str], auto_save: bool):
+    """Prints answer block for one question"""
+    if response:
+        lines = ["", SEP_EQ, f"📝 Answer: {question}", SEP_EQ, response, SEP_EQ]
+        if auto_save:
+            lines += ["", "✅ Response automatically saved as note in notebook"]
+        _write(*lines)
+    else:
+        print(f"\n❌ Failed to get response: {question}")
+
+
+def _settle(future: 'asyncio.Future', line: Optional[str], error: Optional[BaseException]):
+    """Completes input future on the event loop (ignored if already done)"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
     else:
-        # Execute query without auto-save
+        future.set_result(line)
+
+
+async def _ainput(prompt: str) -> str:
+    """
+    Reads console line without blocking the event loop.
+    
+    Uses a daemon thread rather than asyncio.to_thread: a pending input()
+    must not keep the default executor (and so asyncio.run) from
+    shutting down on Ctrl+C.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def read():
         try:
-            response = client.query(notebook_id, question)
-            return response
+            line, error = input(prompt), None
         except Exception as e:
-            print(f"❌ Error during query: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+            line, error = None, e
+        try:
+            loop.call_soon_threadsafe(_settle, future, line, error)
+        except RuntimeError:
+            # Event loop already closed - session is over
+            pass
+    
+    threading.Thread(target=read, daemon=True).start()
+    return await future
 
 
-def interactive_query():
-    """Interactive mode for queries"""
-    print("="*60)
-    print("🔍 Interactive NotebookLM notebook query")
-    print("="*60)
+async def interactive_query_async():
+    """
+    Interactive mode for queries.
+    
+    Each question is sent in the background as soon as it is entered,
+    so the next one can be typed while NotebookLM is still answering.
+    Answers are printed as they arrive. An empty question ends the
+    session once pending answers are in.
+    """
+    _write(SEP_EQ, "🔍 Interactive NotebookLM notebook query", SEP_EQ)
+    
+    from client_factory import get_notebooklm_client
+    
+    # Client and config are resolved once and reused for every call below
+    client = get_notebooklm_client()
+    config = get_config()
     
     # List notebooks
     print("\n📚 Loading notebook list...")
-    notebooks = list_notebooks()
+    notebooks = await asyncio.to_thread(list_notebooks, client)
     
     if not notebooks:
         print("❌ Failed to load notebooks")
         return
     
-    print(f"\n✅ Found notebooks: {len(notebooks)}")
-    print("\nAvailable notebooks:")
-    for i, notebook in enumerate(notebooks, 1):
-        print(f"  {i}. {notebook.title} (ID: {notebook.id})")
+    _write(
+        f"\n✅ Found notebooks: {len(notebooks)}",
+        "\nAvailable notebooks:",
+        *(f"  {i}. {notebook.title} (ID: {notebook.id})" for i, notebook in enumerate(notebooks, 1))
+    )
     
     # Select notebook
-    try:
-        choice = input("\nSelect notebook number (or enter ID): ").strip()
-        
-        if choice.isdigit():
-            idx = int(choice) - 1
-            if 0 <= idx < len(notebooks):
-                selected_notebook = notebooks[idx]
-            else:
-                print("❌ Invalid number")
-                return
+    choice = (await _ainput("\nSelect notebook number (or enter ID): ")).strip()
+    
+    if choice.isdigit():
+        idx = int(choice) - 1
+        if 0 <= idx < len(notebooks):
+            selected_notebook = notebooks[idx]
         else:
-            # Search by ID
-            selected_notebook = next((n for n in notebooks if n.id == choice), None)
-            if not selected_notebook:
-                print("❌ Notebook not found")
-                return
-        
-        print(f"\n✅ Selected notebook: {selected_notebook.title}")
-        print(f"   ID: {selected_notebook.id}")
-        
-        # Query
-        print("\n" + "-"*60)
-        print("💡 Tip: Use format 'In section [name] find [topic]'")
-        print("   Example: 'In section 'Python Basics' find information about functions'")
-        print("-"*60)
-        
-        question = input("\nEnter your question: ").strip()
-        
-        if not question:
-            print("❌ Question cannot be empty")
+            print("❌ Invalid number")
             return
+    else:
+        # Search by ID
+        selected_notebook = next((n for n in notebooks if n.id == choice), None)
+        if not selected_notebook:
+            print("❌ Notebook not found")
+            return
+    
+    _write(f"\n✅ Selected notebook: {selected_notebook.title}", f"   ID: {selected_notebook.id}")
+    
+    # Ask about auto-save (applies to the whole session)
+    save_note = (await _ainput("\n💾 Automatically save responses as notes? (Y/n): ")).strip().lower()
+    auto_save = save_note != 'n'
+    
+    # Query
+    _write(
+        "\n" + SEP_DASH,
+        "💡 Tip: Use format 'In section [name] find [topic]'",
+        "   Example: 'In section 'Python Basics' find information about functions'",
+        "   Enter empty question to finish",
+        SEP_DASH
+    )
+    
+    async def ask(question: str):
+        # Errors are reported here: a finished task is dropped from pending,
+        # so nothing else would retrieve its exception
+        try:
+            response = await asyncio.to_thread(
+                _run_one_query, client, config, selected_notebook.id, question, auto_save
+            )
+        except Exception as e:
+            print(f"\n❌ Failed to get response: {question} ({type(e).__name__}: {e})")
+            if config.verbose:
+                traceback.print_exc()
+            return
+        _print_answer(question, response, auto_save)
+    
+    pending = set()
+    while True:
+        question = (await _ainput("\nEnter your question: ")).strip()
+        if not question:
+            break
         
-        # Ask about auto-save
-        save_note = input("\n💾 Automatically save response as note? (Y/n): ").strip().lower()
-        auto_save = save_note != 'n'
-        
-        print("\n⏳ Executing query...")
-        response = query_notebook_direct(selected_notebook.id, question, auto_save=auto_save)
-        
-        if response:
-            print("\n" + "="*60)
-            print("📝 Answer:")
-            print("="*60)
-            print(response)
-            print("="*60)
-            if auto_save:
-                print("\n✅ Response automatically saved as note in notebook")
-        else:
-            print("\n❌ Failed to get response")
-            
-    except KeyboardInterrupt:
+        print("⏳ Executing query (you can type the next question)...")
+        task = asyncio.create_task(ask(question))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    
+    if pending:
+        print(f"\n⏳ Waiting for {len(pending)} pending answer(s)...")
+        await asyncio.gather(*pending)
+
+
+def interactive_query():
+    """Interactive mode for queries (runs interactive_query_async)"""
+    try:
+        asyncio.run(interactive_query_async())
+    except (KeyboardInterrupt, EOFError):
         print("\n\n👋 Exiting...")
     except Exception as e:
-        print(f"\n❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"\n❌ {type(e).__name__}: {e}")
+        # Full stack only in verbose mode
+        if get_config().verbose:
+            traceback.print_exc()
 
 
-def main():
-    """Main function"""
-    if len(sys.argv) == 1:
-        # Interactive mode
-        interactive_query()
-    elif len(sys.argv) == 3:
-        # Mode with arguments: notebook_id question
-        notebook_id = sys.argv[1]
-        question = sys.argv[2]
-        
-        print(f"📋 Notebook ID: {notebook_id}")
-        print(f"❓ Question: {question}\n")
-        
-        # Auto-save enabled by default
-        response = query_notebook_direct(notebook_id, question, auto_save=True)
-        
-        if response:
-            print("\n📝 Answer:")
-            print("-"*60)
-            print(response)
-            print("-"*60)
-            print("\n✅ Response automatically saved as note in notebook")
-        else:
-            print("\n❌ Failed to get response")
-            sys.exit(1)
-    elif len(sys.argv) == 4 and sys.argv[3] in ['--no-save', '--no-auto-save']:
-        # Mode with auto-save disabled
-        notebook_id = sys.argv[1]
-        question = sys.argv[2]
-        
-        print(f"📋 Notebook ID: {notebook_id}")
-        print(f"❓ Question: {question}\n")
-        
-        response = query_notebook_direct(notebook_id, question, auto_save=False)
-        
-        if response:
-            print("\n📝 Answer:")
-            print("-"*60)
-            print(response)
-            print("-"*60)
-        else:
-            print("\n❌ Failed to get response")
-            sys.exit(1)
+def _cmd_query(args: argparse.Namespace) -> int:
+    """Handles 'query' command"""
+    auto_save = not args.no_save
+    
+    _write(f"📋 Notebook ID: {args.notebook_id}", f"❓ Question: {args.question}\n")
+    
+    response = query_notebook_direct(args.notebook_id, args.question, auto_save=auto_save)
+    
+    if not response:
+        print("\n❌ Failed to get response")
+        return 1
+    
+    if auto_save:
+        _write("\n📝 Answer:", SEP_DASH, response, SEP_DASH,
+               "\n✅ Response automatically saved as note in notebook")
     else:
-        print("Usage:")
-        print("  python3 query_notebook_mcp.py                    # Interactive mode")
-        print("  python3 query_notebook_mcp.py <notebook_id> <question>")
-        print("  python3 query_notebook_mcp.py <notebook_id> <question> --no-save  # Without auto-save")
-        sys.exit(1)
+        _write("\n📝 Answer:", SEP_DASH, response, SEP_DASH)
+    return 0
+
+
+def _cmd_batch(args: argparse.Namespace) -> int:
+    """Handles 'batch' command: questions from file in one query"""
+    questions = _read_questions(args.file)
+    if not questions:
+        print("❌ No questions found")
+        return 1
+    
+    _write(f"📋 Notebook ID: {args.notebook_id}", f"❓ Questions: {len(questions)}\n")
+    
+    answers = query_notebook_batch(args.notebook_id, questions, auto_save=not args.no_save)
+    
+    if answers is None:
+        print("\n❌ Failed to get response")
+        return 1
+    
+    lines = []
+    for i, (question, answer) in enumerate(zip(questions, answers), 1):
+        lines += [f"\n❓ {i}. {question}", SEP_DASH, answer if answer else "❌ No answer"]
+    _write(*lines, SEP_DASH)
+    return 0 if all(answers) else 1
+
+
+def _cmd_interactive(args: argparse.Namespace) -> int:
+    """Handles 'interactive' command"""
+    interactive_query()
+    return 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Builds command line parser"""
+    # Accepted before and after the command; SUPPRESS keeps the subcommand
+    # default from overwriting a flag given before it
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--no-cache", action="store_true", default=argparse.SUPPRESS,
+        help="bypass cached answers (in-memory and disk)"
+    )
+    
+    parser = argparse.ArgumentParser(
+        prog="query_notebook_mcp.py",
+        description="Query NotebookLM notebooks. Without a command runs interactive mode; "
+                    "'<notebook_id> <question>' is a shortcut for 'query'.",
+        parents=[common]
+    )
+    commands = parser.add_subparsers(dest="command")
+    
+    # Options shared by commands that query a notebook
+    notebook = argparse.ArgumentParser(add_help=False, parents=[common])
+    notebook.add_argument("notebook_id", help="notebook ID")
+    notebook.add_argument(
+        "--no-save", "--no-auto-save", dest="no_save", action="store_true",
+        help="don't save answers as notes"
+    )
+    
+    query = commands.add_parser("query", parents=[notebook], help="ask a notebook a question")
+    query.add_argument("question", help="question")
+    query.set_defaults(handler=_cmd_query)
+    
+    batch = commands.add_parser(
+        "batch", parents=[notebook],
+        help="ask questions from a file (one per line, '-' for stdin) in one query"
+    )
+    batch.add_argument("file", help="questions file ('-' for stdin)")
+    batch.set_defaults(handler=_cmd_batch)
+    
+    interactive = commands.add_parser("interactive", parents=[common], help="interactive mode")
+    interactive.set_defaults(handler=_cmd_interactive)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main function"""
+    args_list = sys.argv[1:] if argv is None else list(argv)
+    
+    # Legacy form "<notebook_id> <question> [--no-save]" maps to "query"
+    first = next((arg for arg in args_list if not arg.startswith("-")), None)
+    if first is not None and first not in ("query", "batch", "interactive"):
+        args_list.insert(0, "query")
+    
+    parser = _build_parser()
+    args = parser.parse_args(args_list)
+    
+    if getattr(args, "no_cache", False):
+        # Disables both in-memory and disk query caches for this run
+        set_config(replace(get_config(), use_query_cache=False))
+    
+    handler = getattr(args, "handler", _cmd_interactive)
+    sys.exit(handler(args))
 
 
 if __name__ == "__main__":
     main()
-